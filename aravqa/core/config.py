@@ -1,3 +1,4 @@
+import os
 import torch
 import textwrap
 
@@ -33,6 +34,8 @@ class Config:
 
     # -------------------- Batch and Caption Settings --------------------
     BATCH_SIZE = 20  # Batch size for processing
+    NUM_WORKERS = (os.cpu_count() or 2) // 2  # DataLoader worker processes (0 loads batches in the main process)
+    PREFETCH_FACTOR = 2  # Batches prefetched per worker; higher values cost memory without speedup
     
 
     # Number of captions to select (-1 means all captions)
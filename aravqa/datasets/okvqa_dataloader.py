@@ -1,7 +1,11 @@
 import torch
+import operator
 from aravqa.core.config import CaptionSelection
 import numpy as np
 
+# Extracts the answer text from an answer dictionary
+get_answer = operator.methodcaller("get", "answer", "")
+
 class OKVQADataLoader:
     def __init__(self, dataset, config):
         """
@@ -20,6 +24,8 @@ class OKVQADataLoader:
         self.caption_selection = config.CAPTION_SELECTION
         self.num_captions = config.NUM_CAPTIONS
         self.random_seed = config.RANDOM_SEED
+        self.num_workers = getattr(config, "NUM_WORKERS", 0)
+        self.prefetch_factor = getattr(config, "PREFETCH_FACTOR", 2)
     
 
     def filter_captions(self, captions, selection_strategy, num_captions):
@@ -149,26 +155,15 @@ class OKVQADataLoader:
             dict: A dictionary containing batched prompts, answers, images, and metadata.
         """
         
-        result = {
-            "question_id":[],
-            "image_id":[],
-            "prompts":[],
-            "answers":[],
-        }
-        
-
-        for item in batch:
+        create_prompt = self.create_prompt
+        return {
+            "question_id": [item["metadata"]["question_id"] for item in batch],
+            "image_id": [item["metadata"]["image_id"] for item in batch],
             # Create a prompt using filtered captions
-            prompt = self.create_prompt(item["question"], {
-                "bit": item["bit"],
-                "violet": item["violet"]
-            })
-            
-            result["question_id"].append(item["metadata"]["question_id"])
-            result["image_id"].append(item["metadata"]["image_id"])
-            result["prompts"].append(prompt)
-            result["answers"].append(list(map(lambda ans:ans.get("answer",""),item["answers"])))
-        return result
+            "prompts": [create_prompt(item["question"], {"bit": item["bit"], "violet": item["violet"]})
+                        for item in batch],
+            "answers": [list(map(get_answer, item["answers"])) for item in batch],
+        }
                                      
 
      
@@ -185,4 +180,7 @@ class OKVQADataLoader:
             batch_size=self.batch_size,
             shuffle=False,
             collate_fn=self.collate_fn,
+            num_workers=self.num_workers,
+            persistent_workers=self.num_workers > 0,
+            prefetch_factor=self.prefetch_factor if self.num_workers > 0 else None,
         )
@@ -1,4 +1,4 @@
-from .okvqa_dataloader import OKVQADataLoader
+from .okvqa_dataloader import OKVQADataLoader, get_answer
 import torch
 
 class VQAv2DataLoader(OKVQADataLoader):
@@ -23,28 +23,16 @@ class VQAv2DataLoader(OKVQADataLoader):
             dict: A dictionary containing batched prompts, answers, images, and metadata.
         """
         
-        result = {
-            "question_id":[],
-            "image_id":[],
-            "prompts":[],
-            "answers":[],
-            "multiple_choice_answer":[],
-        }
-        
-
-        for item in batch:
+        create_prompt = self.create_prompt
+        return {
+            "question_id": [item["metadata"]["question_id"] for item in batch],
+            "image_id": [item["metadata"]["image_id"] for item in batch],
             # Create a prompt using filtered captions
-            prompt = self.create_prompt(item["question"], {
-                "bit": item["bit"],
-                "violet": item["violet"]
-            })
-            
-            result["question_id"].append(item["metadata"]["question_id"])
-            result["image_id"].append(item["metadata"]["image_id"])
-            result["prompts"].append(prompt)
-            result["answers"].append(list(map(lambda ans:ans.get("answer",""),item["answers"])))
-            result["multiple_choice_answer"].append(item["multiple_choice_answer"])
-        return result
+            "prompts": [create_prompt(item["question"], {"bit": item["bit"], "violet": item["violet"]})
+                        for item in batch],
+            "answers": [list(map(get_answer, item["answers"])) for item in batch],
+            "multiple_choice_answer": [item["multiple_choice_answer"] for item in batch],
+        }
                                      
 
      
@@ -61,6 +49,9 @@ class VQAv2DataLoader(OKVQADataLoader):
             batch_size=self.batch_size,
             shuffle=False,
             collate_fn=self.collate_fn,
+            num_workers=self.num_workers,
+            persistent_workers=self.num_workers > 0,
+            prefetch_factor=self.prefetch_factor if self.num_workers > 0 else None,
         )
 
 
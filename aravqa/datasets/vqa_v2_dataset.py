@@ -4,20 +4,27 @@ class VQAv2Dataset(torch.utils.data.Dataset):
     def __init__(self, BDS, VDS):
         self.BDS = BDS
         self.VDS = VDS
-       
+
+        # Split the columns once into Arrow-backed views so __getitem__ fetches each row a single time
+        # and only decodes what it needs. The views stay memory-mapped, so forked workers share them.
+        self.rows = BDS.select_columns([column for column in BDS.column_names if column != "image"])
+        self.images = BDS.select_columns(["image"])
+        self.violet_captions = VDS.select_columns(["captions"]) if "captions" in VDS.column_names else None
+
 
     def __len__(self):
         return len(self.BDS)
 
     def __getitem__(self, idx):
+        row = self.rows[idx]
         example = {
-            "metadata": self.BDS[idx]["metadata"],
-            "image": self.BDS[idx]["image"],
-            "question": self.BDS[idx]["question"],
-            "answers": self.BDS[idx].get("answers",[]),
-            "multiple_choice_answer": self.BDS[idx]["multiple_choice_answer"],
-            "bit": self.BDS[idx].get("captions",[]),
-            "violet": self.VDS[idx].get("captions",[])
-            
+            "metadata": row["metadata"],
+            "image": self.images[idx]["image"],
+            "question": row["question"],
+            "answers": row.get("answers",[]),
+            "multiple_choice_answer": row["multiple_choice_answer"],
+            "bit": row.get("captions",[]),
+            "violet": self.violet_captions[idx]["captions"] if self.violet_captions is not None else []
+
         }
-        return example
\ No newline at end of file
+        return example
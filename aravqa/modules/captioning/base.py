@@ -3,8 +3,15 @@ from typing import List, Union, Iterable
 from PIL import Image
 import numpy as np
 import torch
-from io import BytesIO
 import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+
+# Shared HTTP session so URL images reuse pooled TCP/TLS connections
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(pool_connections=16, pool_maxsize=64))
+_SESSION.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=64))
+_REQUEST_TIMEOUT = 10  # Seconds to wait for an image server before giving up
 
 class BaseCaptioner(ABC):
   """
@@ -41,40 +48,71 @@ class BaseCaptioner(ABC):
     try:
 
       if isinstance(image, Image.Image):
-        return image.convert("RGB")
+        return image if image.mode == "RGB" else image.convert("RGB")
       
       elif isinstance(image, str):
         if image.startswith("http"):
-          response = requests.get(image, stream=True)
-          response.raise_for_status()
-          return Image.open(BytesIO(response.content)).convert("RGB")
+          with _SESSION.get(image, stream=True, timeout=_REQUEST_TIMEOUT) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True  # Let urllib3 undo any gzip/deflate transfer encoding
+            im = Image.open(response.raw)
+            im.load()
         else:
-          return Image.open(image).convert("RGB")
+          im = Image.open(image)
+          im.load()
+        # Images decoded as RGB (most JPEGs) skip the full-buffer copy of convert()
+        return im if im.mode == "RGB" else im.convert("RGB")
       
       elif isinstance(image, np.ndarray):
+        if image.ndim == 3 and image.shape[2] == 3 and image.dtype == np.uint8:
+          return Image.fromarray(image)
         return Image.fromarray(image).convert("RGB")
   
       elif torch.is_tensor(image):
-        return Image.fromarray(image.permute(1, 2, 0).cpu().numpy().astype(np.uint8)).convert("RGB")
+        return self._prepare_image(self._tensor_to_numpy(image))
       
       else:
         raise ValueError(f"Unsupported image input type: {type(image)}")
     
-    except requests.exceptions.RequestException as e:
+    # Reading response.raw surfaces urllib3 errors (ProtocolError, ReadTimeoutError, DecodeError) directly
+    except (requests.exceptions.RequestException, urllib3.exceptions.HTTPError) as e:
       raise requests.exceptions.RequestException(f"Error downloading image: {e}")
   
 
+  @staticmethod
+  def _tensor_to_numpy(image: torch.Tensor) -> np.ndarray:
+    """
+    Converts a (C, H, W) or (N, C, H, W) image tensor to a channels-last uint8 NumPy array.
+    Casting and re-layout happen on the tensor's device so the host receives a single contiguous copy.
+
+    Args:
+        image: The image tensor, channels-first.
+
+    Returns:
+        A NumPy array of shape (H, W, C) or (N, H, W, C) with dtype uint8.
+    """
+    image = image.detach()
+    if image.dtype != torch.uint8:
+      image = image.clamp(0, 255).to(torch.uint8)
+    return image.movedim(-3, -1).contiguous().cpu().numpy()
+
+
   def prepare_images(self, images: Union[List[Union[str, np.ndarray, Image.Image]], np.ndarray, str, Image.Image]) -> List[Image.Image]:
     """
     Prepares a batch of images for caption generation by converting them to PIL Images in RGB format.
 
     Args:
-        images: A list of input images. Can be a list of file paths, URLs, NumPy arrays, or PIL Images.
+        images: A list of input images. Can be a list of file paths, URLs, NumPy arrays, or PIL Images,
+                or a batched (N, C, H, W) PyTorch tensor.
 
     Returns:
         A list of PIL Image objects in RGB format.
     """
 
+    if torch.is_tensor(images) and images.dim() == 4:
+      # Transfer the whole (N, C, H, W) batch at once and wrap views of it
+      return [self._prepare_image(array) for array in self._tensor_to_numpy(images)]
+
     if not isinstance(images, list):
       images = [images]
 
@@ -1,4 +1,11 @@
+import os
 import torch
+from contextlib import contextmanager
+import torchvision
+from torchvision.io import ImageReadMode
+from torchvision.transforms import InterpolationMode
+from torchvision.transforms import v2
+from torchvision.transforms.v2.functional import pil_to_tensor
 from typing import List, Union, Iterable
 from PIL import Image
 from violet.configuration import VioletConfig
@@ -10,6 +17,21 @@ import numpy as np
 from .base import BaseCaptioner
 
 
+class _VisualFeatureEncoder(torch.nn.Module):
+  """
+  Runs the CLIP vision tower and the Violet visual encoder as one module, so both compile into a single graph.
+  """
+  def __init__(self, clip, encoder):
+    super().__init__()
+    self.clip = clip
+    self.encoder = encoder
+
+  def forward(self, pixel_values: torch.Tensor) -> torch.Tensor:
+    image_embeds = self.clip(pixel_values).image_embeds.unsqueeze(1)
+    features,_ = self.encoder(image_embeds)
+    return features
+
+
 class VioletCaptioner(BaseCaptioner):
   """
   Implementation of the Violet captioning model.
@@ -32,13 +54,22 @@ class VioletCaptioner(BaseCaptioner):
     """
     self.tokenizer = AutoTokenizer.from_pretrained(self.config.TOKENIZER_NAME)
     self.processor = AutoProcessor.from_pretrained(self.config.PROCESSOR_NAME)
+
+    # Tensor transforms rebuilt from the image processor's config, or None to keep using the HF processor
+    self.resize_crop, self.normalize = self._build_transforms(getattr(self.processor, "image_processor", self.processor))
+
+    self.eos_token_id = self.tokenizer.vocab['<|endoftext|>']
+    self.max_length = self.config.MAX_LENGTH
+    self.beam_size = self.config.BEAM_SIZE
+    self.out_size = self.config.OUT_SIZE
+
     encoder = VisualEncoder(N=self.config.ENCODER_LAYERS,
                             padding_idx=0,
                             attention_module=ScaledDotProductAttention
                             )
 
     self.model = Violet(
-            bos_idx=self.tokenizer.vocab['<|endoftext|>'],
+            bos_idx=self.eos_token_id,
             encoder=encoder,
             n_layer=self.config.DECODER_LAYERS,
             tau=self.config.TAU,
@@ -47,11 +78,187 @@ class VioletCaptioner(BaseCaptioner):
 
     checkpoint = torch.load(self.config.CHECKPOINT_DIR, map_location=self.device)
     self.model.load_state_dict(checkpoint['state_dict'], strict=False)
-    self.model.to(self.device)
+
+    # Optional reduced precision (config.DTYPE = "fp16" or "bf16"), only applied on CUDA
+    self.device_type = torch.device(self.device).type
+    self.dtype = torch.float32
+    if self.device_type == "cuda":
+      self.dtype = {"fp16": torch.float16, "bf16": torch.bfloat16}.get(getattr(self.config, "DTYPE", None), torch.float32)
+
+    self.model.to(self.device, dtype=self.dtype)
     self.model.eval()
+    self.model.requires_grad_(False)
+
+    # Compile the visual forward pass on CUDA (disable with config.COMPILE = False)
+    self.compiled = getattr(self.config, "COMPILE", True) and self.device_type == "cuda"
+    self.visual_encoder = _VisualFeatureEncoder(self.model.clip, self.model.encoder)
+    if self.compiled:
+      self.visual_encoder = torch.compile(self.visual_encoder, mode="reduce-overhead", fullgraph=False)
+
+
+  @staticmethod
+  def _build_transforms(image_processor):
+    """
+    Rebuilds the HF image processor's resize, center crop, rescale and normalize steps as torchvision
+    transforms that run on tensors on the model device. Resize/crop runs per image (inputs differ in size);
+    rescaling and normalization run once on the stacked batch.
+
+    Args:
+        image_processor: The Hugging Face image processor loaded for the CLIP vision tower.
+
+    Returns:
+        A (resize_crop, normalize) pair of transforms, or (None, None) if the processor's config
+        cannot be mapped onto tensor transforms and the HF processor should be used instead.
+    """
+    # PIL resample codes that tensor resizing supports
+    interpolations = {0: InterpolationMode.NEAREST, 2: InterpolationMode.BILINEAR, 3: InterpolationMode.BICUBIC}
+
+    try:
+      resize_crop = []
+      if getattr(image_processor, "do_resize", False):
+        size = image_processor.size
+        if "shortest_edge" in size:
+          size = size["shortest_edge"]
+        elif "height" in size and "width" in size:
+          size = (size["height"], size["width"])
+        else:
+          return None, None
+        interpolation = interpolations.get(int(image_processor.resample))
+        if interpolation is None:
+          return None, None
+        resize_crop.append(v2.Resize(size, interpolation=interpolation, antialias=True))
+
+      if getattr(image_processor, "do_center_crop", False):
+        crop_size = image_processor.crop_size
+        resize_crop.append(v2.CenterCrop((crop_size["height"], crop_size["width"])))
+
+      normalize = [v2.ToDtype(torch.float32)]
+      if getattr(image_processor, "do_rescale", False):
+        rescale_factor = image_processor.rescale_factor
+        normalize.append(v2.Lambda(lambda pixel_values: pixel_values * rescale_factor))
+      if getattr(image_processor, "do_normalize", False):
+        normalize.append(v2.Normalize(mean=image_processor.image_mean, std=image_processor.image_std))
+
+    except (AttributeError, KeyError, TypeError, ValueError):
+      return None, None
+
+    return v2.Compose(resize_crop), v2.Compose(normalize)
+
+
+  @contextmanager
+  def _tf32(self):
+    """
+    Enables TF32 matmuls for Violet's own FP32 forward passes when config.TF32 is set,
+    restoring the process-wide setting afterwards.
+    """
+    enabled = getattr(self.config, "TF32", False) and self.device_type == "cuda" and self.dtype == torch.float32
+    previous = torch.backends.cuda.matmul.allow_tf32
+    torch.backends.cuda.matmul.allow_tf32 = previous or enabled
+    try:
+      yield
+    finally:
+      torch.backends.cuda.matmul.allow_tf32 = previous
+
+
+  def _autocast(self):
+    """
+    Returns an autocast context matching the model dtype (a no-op when running in FP32).
+    """
+    return torch.autocast(device_type=self.device_type, dtype=self.dtype, enabled=self.dtype != torch.float32)
+
+
+  def _preprocess(self, images: Union[List[Union[str, np.ndarray, Image.Image]], np.ndarray, str, Image.Image]) -> torch.Tensor:
+    """
+    Converts a batch of images into CLIP pixel values on the model device.
+
+    Args:
+        images: A list of input images. Can be a list of file paths, URLs, NumPy arrays, PIL Images or decoded CUDA tensors.
+
+    Returns:
+        torch.Tensor: Pixel values of shape (N, C, H, W).
+    """
+    if self.resize_crop is None:
+      images = self.prepare_images(images)
+      return self.processor(images=images, return_tensors="pt")['pixel_values'].to(self.device, dtype=self.dtype)
+
+    decoded = self._decode_on_gpu(images)
+    if decoded is None:
+      decoded = [pil_to_tensor(image).to(self.device) for image in self.prepare_images(images)]
+    return self._transform(decoded)
+
+
+  def _decode_on_gpu(self, images) -> Union[List[torch.Tensor], None]:
+    """
+    Decodes local JPEG files with nvJPEG so they never pass through PIL (disable with config.GPU_DECODE = False).
+    Only used when the tensor transforms could be built, since decoded images skip the HF processor.
+
+    Args:
+        images: The raw input images passed to _preprocess.
+
+    Returns:
+        A list of uint8 (3, H, W) CUDA tensors, or None if any input has to go through the PIL path.
+    """
+    if self.device_type != "cuda" or not getattr(self.config, "GPU_DECODE", True):
+      return None
+
+    if not isinstance(images, list):
+      images = [images]
+
+    # Only decode once every input is known to qualify, so no GPU work is discarded
+    def is_jpeg_path(image):
+      return (isinstance(image, str) and not image.startswith("http")
+              and os.path.splitext(image)[1].lower() in (".jpg", ".jpeg"))
+
+    def is_decoded(image):
+      return (torch.is_tensor(image) and image.is_cuda and image.dtype == torch.uint8
+              and image.dim() == 3 and image.shape[0] == 3)
+
+    if not all(is_jpeg_path(image) or is_decoded(image) for image in images):
+      return None
+
+    paths = [image for image in images if is_jpeg_path(image)]
+    if not paths:
+      return images
+
+    try:
+      jpegs = iter(torchvision.io.decode_jpeg([torchvision.io.read_file(path) for path in paths],
+                                              mode=ImageReadMode.RGB, device=self.device))
+    except RuntimeError:
+      # Mislabelled files or JPEGs nvJPEG cannot handle are left to the PIL path
+      return None
+    return [next(jpegs) if is_jpeg_path(image) else image for image in images]
+
+
+  def _transform(self, images: List[torch.Tensor]) -> torch.Tensor:
+    """
+    Applies the CLIP resize, center crop and normalization to decoded images on the model device.
+
+    Args:
+        images: A list of uint8 (3, H, W) tensors on the model device.
+
+    Returns:
+        torch.Tensor: Pixel values of shape (N, C, H, W).
+    """
+    pixel_values = self.normalize(torch.stack([self.resize_crop(image) for image in images]))
+    return pixel_values.to(dtype=self.dtype)
+
+
+  def _encode(self, pixel_values: torch.Tensor) -> torch.Tensor:
+    """
+    Runs the CLIP vision tower and the Violet visual encoder over pixel values.
+
+    Args:
+        pixel_values (torch.Tensor): Pixel values of shape (N, C, H, W).
+
+    Returns:
+        torch.Tensor: Encoded visual features.
+    """
+    with torch.inference_mode(), self._tf32(), self._autocast():
+        features = self.visual_encoder(pixel_values)
+    # CUDA graph outputs are overwritten by the next replay, so hand callers their own copy
+    return features.clone() if self.compiled else features
 
 
-  
   def extract_visual_features(self, images: Union[List[Union[str, np.ndarray, Image.Image]], np.ndarray, str, Image.Image]) -> Iterable:
     """
     Extracts visual features from a batch of images using the Violet model.
@@ -62,14 +269,7 @@ class VioletCaptioner(BaseCaptioner):
     Returns:
         torch.Tensor: Encoded visual features.
     """
-
-    images = self.prepare_images(images)
-    images = self.processor(images=images, return_tensors="pt")['pixel_values'].to(self.device)
-    with torch.no_grad():
-        outputs = self.model.clip(images)
-        image_embeds = outputs.image_embeds.unsqueeze(1)  
-        features,_ = self.model.encoder(image_embeds)
-    return features
+    return self._encode(self._preprocess(images))
 
 
 
@@ -83,19 +283,26 @@ class VioletCaptioner(BaseCaptioner):
     Returns:
         A list of lists of dictionaries containing generated captions for each image.
     """
-    with torch.no_grad():
+    with torch.inference_mode(), self._tf32(), self._autocast():
       output,_ = self.model.beam_search(
           visual=features,
-          max_len=self.config.MAX_LENGTH,
-          eos_idx=self.tokenizer.vocab['<|endoftext|>'],
-          beam_size=self.config.BEAM_SIZE,
-          out_size=self.config.OUT_SIZE,
+          max_len=self.max_length,
+          eos_idx=self.eos_token_id,
+          beam_size=self.beam_size,
+          out_size=self.out_size,
           is_feature=True
       )
 
+    # Beam search drops the beam axis when out_size == 1
+    if output.dim() == 2:
+      output = output.unsqueeze(1)
+
+    # Decode all beams of all images in one tokenizer call, then regroup per image
+    num_images, num_beams = output.shape[0], output.shape[1]
+    strings = self.tokenizer.batch_decode(output.reshape(-1, output.shape[-1]).tolist(), skip_special_tokens=True)
     captions = [
-        [{"caption":self.tokenizer.decode(seq, skip_special_tokens=True)} for seq in output[i]]
-        for i in range(output.shape[0])
+        [{"caption":strings[i * num_beams + j]} for j in range(num_beams)]
+        for i in range(num_images)
         ]
     return captions
 
@@ -110,7 +317,8 @@ class VioletCaptioner(BaseCaptioner):
     Returns:
         A list of lists of dictionaries containing generated captions for each image.
     """
-    features = self.extract_visual_features(images)
+    pixel_values = self._preprocess(images)
+    features = self._encode(pixel_values)
     return self.generate_captions_from_features(features)
   
   def __call__(self, images: Union[List[Union[str, np.ndarray, Image.Image]], np.ndarray, str, Image.Image]) -> Iterable: